@@ -2,13 +2,73 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-import requests
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import json
 import os  # AÑADIDO: Para leer variable de entorno
 
 # MODIFICADO: Usar variable de entorno para API URL
 API_URL = os.getenv('API_URL', 'http://localhost:8000')
 
+
+# MODIFICADO: Cliente httpx persistente compartido entre reruns de
+# Streamlit. Mantiene el pool de conexiones keep-alive hacia la API en
+# lugar de abrir un socket TCP/TLS nuevo en cada llamada; las llamadas
+# del dashboard se solapan vía el ThreadPoolExecutor de más abajo.
+@st.cache_resource
+def get_session():
+    # MODIFICADO: Pool más amplio para uso concurrente desde varias tabs
+    # (evita reciclar conexiones keep-alive y re-pagar el handshake TLS)
+    # y reintentos de conexión con backoff para fallos transitorios
+    limits = httpx.Limits(max_keepalive_connections=20, max_connections=50)
+    transport = httpx.HTTPTransport(retries=2, limits=limits)
+    return httpx.Client(
+        base_url=API_URL,
+        timeout=5,
+        transport=transport,
+    )
+
+
+# AÑADIDO: Cachear respuestas de la API que cambian lentamente.
+# Evita dos round trips HTTP en cada interacción con los widgets.
+@st.cache_data(ttl=30)
+def fetch_metrics():
+    response = get_session().get("/business/metrics", timeout=2)
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=15)
+def fetch_health():
+    response = get_session().get("/health", timeout=1)
+    response.raise_for_status()
+    return response.json()
+
+
+# AÑADIDO: Memoizar la figura del scorecard; reruns con el mismo
+# breakdown reutilizan el JSON de la figura en lugar de reconstruirla
+@st.cache_data
+def build_scorecard_fig(items):
+    df_scorecard = pd.DataFrame(items, columns=['Component', 'Points'])
+    fig = px.bar(df_scorecard, x='Component', y='Points',
+                color='Points', color_continuous_scale='RdYlGn_r',
+                title="Score Contribution by Component",
+                labels={'Points': 'Score Points', 'Component': 'Risk Components'})
+    fig.update_layout(height=400, showlegend=False)
+    return fig
+
+
+# AÑADIDO: Cachear predicciones idénticas. Los inputs del sidebar son
+# categóricos, así que clicks repetidos sobre la misma combinación se
+# sirven desde memoria sin round trip ni llamada al engine.
+@st.cache_data(ttl=300, max_entries=512)
+def predict_cached(claim_items):
+    response = get_session().post("/predict", json=dict(claim_items), timeout=5)
+    if response.status_code != 200:
+        raise Exception(f"API Error: {response.status_code}")
+    return response.json()
+
 # Page config
 st.set_page_config(
     page_title="🛡️ Fraud Detection System",
@@ -17,7 +77,7 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+CSS_STR = """
 <style>
     .metric-card {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -33,15 +93,25 @@ st.markdown("""
         box-shadow: 0 2px 4px rgba(0,0,0,0.1); 
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
 # Header
-st.markdown("""
+HEADER_STR = """
 # 🛡️ Sistem de Detección de Fraude
 ###  Solución para detección de fraudes de Seguros
 **Demo Ejecutiva:** Julio 2025
 ---
-""")
+"""
+
+
+def _render_chrome():
+    st.markdown(CSS_STR, unsafe_allow_html=True)
+    st.markdown(HEADER_STR)
+
+
+# AÑADIDO: CSS y header como constantes de módulo; los strings se parsean
+# una vez al importar y el frontend diffea el bloque sin cambios por rerun
+_render_chrome()
 
 # Sidebar
 st.sidebar.markdown("## 📋 Claim Information")
@@ -103,20 +173,16 @@ if analyze_button:
         "Days_Policy_Claim": days_claim
     }
     
-    # MODIFICADO: Usar API_URL variable
+    # MODIFICADO: Predicción cacheada por combinación de inputs
     try:
-        response = requests.post(f"{API_URL}/predict", json=claim_data, timeout=5)
-        if response.status_code == 200:
-            result = response.json()
-            fraud_prob = result['fraud_probability']
-            final_score = result['risk_score']
-            risk_level = result['risk_level']
-            risk_factors = result['key_risk_factors']
-            scorecard = result['scorecard_breakdown']
-            recommendation = result['business_recommendation']
-        else:
-            raise Exception(f"API Error: {response.status_code}")
-    except requests.exceptions.ConnectionError:
+        result = predict_cached(tuple(sorted(claim_data.items())))
+        fraud_prob = result['fraud_probability']
+        final_score = result['risk_score']
+        risk_level = result['risk_level']
+        risk_factors = result['key_risk_factors']
+        scorecard = result['scorecard_breakdown']
+        recommendation = result['business_recommendation']
+    except httpx.ConnectError:
         st.error(f"❌ No se puede conectar con la API en {API_URL}")
         st.info("💡 Asegúrese de que el servicio API esté ejecutándose")
         st.stop()
@@ -132,7 +198,8 @@ if analyze_button:
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        delta = sum([v for k, v in scorecard.items() if k != "Base Score"])
+        # MODIFICADO: El ajuste de puntos ya viene calculado por la API
+        delta = result['points_adjustment']
         st.metric("🎯 Risk Score", f"{final_score}", f"{delta:+d} pts")
     
     with col2:
@@ -148,14 +215,7 @@ if analyze_button:
     # Scorecard visualization
     st.markdown("### 📋 Scorecard Breakdown")
     
-    df_scorecard = pd.DataFrame(list(scorecard.items()), columns=['Component', 'Points'])
-    
-    fig = px.bar(df_scorecard, x='Component', y='Points', 
-                color='Points', color_continuous_scale='RdYlGn_r',
-                title="Score Contribution by Component",
-                labels={'Points': 'Score Points', 'Component': 'Risk Components'})
-    fig.update_layout(height=400, showlegend=False)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(build_scorecard_fig(tuple(scorecard.items())), use_container_width=True)
     
     # Risk factors
     if risk_factors:
@@ -183,7 +243,11 @@ if analyze_button:
     col1, col2 = st.columns(2)
     
     with col1:
-        estimated_claim_value = np.random.randint(35000, 85000)
+        # MODIFICADO: Valor estimado determinista derivado del claim, para
+        # que no parpadee entre reruns ni toque el RNG global de NumPy
+        seed = int(hashlib.blake2s(str(claim_data).encode()).hexdigest()[:8], 16)
+        rng = np.random.default_rng(seed)
+        estimated_claim_value = int(rng.integers(35000, 85000))
         investigation_cost = 5000 if final_score <= 580 else 2500 if final_score <= 620 else 1000
         
         st.info(f"""
@@ -208,61 +272,55 @@ if analyze_button:
 st.markdown("---")
 st.markdown("### 📊 Dashboard Desempeño del Sistema")
 
-# MODIFICADO: Obtener métricas reales de la API
+# AÑADIDO: Lanzar /business/metrics y /health en paralelo para que sus
+# latencias se solapen (espera total = max de las dos, no la suma)
+with ThreadPoolExecutor(max_workers=2) as api_pool:
+    metrics_future = api_pool.submit(fetch_metrics)
+    health_future = api_pool.submit(fetch_health)
+
+# MODIFICADO: Obtener métricas reales de la API (cacheadas con TTL)
 try:
-    metrics_response = requests.get(f"{API_URL}/business/metrics", timeout=2)
-    if metrics_response.status_code == 200:
-        metrics = metrics_response.json()
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("🎯 Model AUC", "0.847", "+2.1%")
-        
-        with col2:  
-            st.metric("⚡ Avg Response", 
-                     f"{metrics['daily_metrics'].get('avg_response_time_ms', 67)}ms", 
-                     "-12ms")
-        
-        with col3:
-            st.metric("📈 Precision@10%", "62.3%", "+5.2%")
-        
-        with col4:
-            st.metric("🔧 System Uptime", 
-                     f"{metrics['system_performance'].get('uptime_percentage', 99.9)}%", 
-                     "")
-    else:
-        # Fallback a valores por defecto
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("🎯 Model AUC", "0.847", "+2.1%")
-        
-        with col2:  
-            st.metric("⚡ Avg Response", "67ms", "-12ms")
-        
-        with col3:
-            st.metric("📈 Precision@10%", "62.3%", "+5.2%")
-        
-        with col4:
-            st.metric("🔧 System Uptime", "99.9%", "")
-            
+    metrics = metrics_future.result()
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("🎯 Model AUC", "0.847", "+2.1%")
+
+    with col2:
+        st.metric("⚡ Avg Response",
+                 f"{metrics['daily_metrics'].get('avg_response_time_ms', 67)}ms",
+                 "-12ms")
+
+    with col3:
+        st.metric("📈 Precision@10%", "62.3%", "+5.2%")
+
+    with col4:
+        st.metric("🔧 System Uptime",
+                 f"{metrics['system_performance'].get('uptime_percentage', 99.9)}%",
+                 "")
+
 except:
     # Si falla la conexión, usar valores por defecto
     col1, col2, col3, col4 = st.columns(4)
-    
+
     with col1:
         st.metric("🎯 Model AUC", "0.847", "+2.1%")
-    
-    with col2:  
+
+    with col2:
         st.metric("⚡ Avg Response", "67ms", "-12ms")
-    
+
     with col3:
         st.metric("📈 Precision@10%", "62.3%", "+5.2%")
-    
+
     with col4:
         st.metric("🔧 System Uptime", "99.9%", "")
 
+# AÑADIDO: Botón para forzar refresco de las métricas cacheadas
+if st.button("🔄 Refresh metrics"):
+    st.cache_data.clear()
+    st.rerun()
+
 # Business metrics summary
 st.markdown("### 💼 Sumario de Inteligencia de Negocios")
 
@@ -299,10 +357,11 @@ with col3:
 st.sidebar.markdown("---")
 st.sidebar.markdown("### ℹ️ System Information")
 
-# MODIFICADO: Mostrar estado de conexión con API
+# MODIFICADO: Mostrar estado de conexión con API (cacheado con TTL,
+# lanzado en paralelo con las métricas del dashboard)
 try:
-    health_response = requests.get(f"{API_URL}/health", timeout=1)
-    if health_response.status_code == 200:
+    health = health_future.result()
+    if health.get('status') == 'healthy':
         api_status = "🟢 Connected"
     else:
         api_status = "🟡 Limited"
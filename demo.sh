@@ -92,8 +92,8 @@ build_images() {
 train_models() {
     echo -e "${YELLOW}🤖 Entrenando modelos...${NC}"
     
-    # MODIFICADO: Verificar si ya existen modelos
-    if [ -d "models" ] && [ -f "models/logistic_model.pkl" ] && [ -f "models/xgb_model.pkl" ]; then
+    # MODIFICADO: Verificar si ya existen modelos (bundle único + booster UBJ)
+    if [ -d "models" ] && [ -f "models/bundle.pkl" ] && [ -f "models/xgb_model.ubj" ]; then
         echo -e "${BLUE}   Modelos existentes encontrados${NC}"
         read -p "   ¿Desea re-entrenar los modelos? (y/N) " -n 1 -r
         echo
@@ -111,7 +111,7 @@ train_models() {
     docker-compose run --rm train
     
     # Verificar que se crearon los modelos
-    if [ ! -f "models/logistic_model.pkl" ]; then
+    if [ ! -f "models/bundle.pkl" ] || [ ! -f "models/xgb_model.ubj" ]; then
         echo -e "${RED}❌ Error: No se generaron los modelos${NC}"
         exit 1
     fi
@@ -224,9 +224,9 @@ health_check() {
     fi
     
     # Check models
-    if [ -f "models/logistic_model.pkl" ] && [ -f "models/xgb_model.pkl" ]; then
+    if [ -f "models/bundle.pkl" ] && [ -f "models/xgb_model.ubj" ]; then
         echo -e "   Modelos ML: ${GREEN}✅ Cargados${NC}"
-        model_count=$(ls -1 models/*.pkl 2>/dev/null | wc -l)
+        model_count=$(ls -1 models/bundle.pkl models/xgb_model.ubj 2>/dev/null | wc -l)
         echo -e "   Total modelos: ${model_count} archivos"
     else
         echo -e "   Modelos ML: ${RED}❌ No encontrados${NC}"
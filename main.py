@@ -7,23 +7,31 @@ Desarrollada por: Aquilino Francisco
 ================================================================================
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.routing import APIRoute
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
+import orjson
 from typing import Dict, List, Optional, Any
+import asyncio
 import pandas as pd
 import numpy as np
 import sys
+import time
 import json
 import logging
 from pathlib import Path
 from datetime import datetime
+from types import MappingProxyType
 import uvicorn
 import os
 
 # Configure logging
+# MODIFICADO: Nivel configurable por entorno (WARNING en producción)
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -38,6 +46,62 @@ except ImportError as e:
     logger.warning(f"⚠️ FraudDetectionEngine no disponible: {str(e)}")
     logger.warning("⚠️ Usando FallbackFraudEngine")
 
+# AÑADIDO: Cache de respuestas respaldado por Redis (opcional). Si
+# fastapi-cache2 o redis no están instalados, @cache se vuelve un no-op
+# y los endpoints siguen respondiendo recomputando en cada request.
+try:
+    from fastapi_cache import FastAPICache
+    from fastapi_cache.backends.redis import RedisBackend
+    from fastapi_cache.decorator import cache
+    from redis import asyncio as aioredis
+    CACHE_AVAILABLE = True
+    logger.info("✅ fastapi-cache2 disponible")
+except ImportError as e:
+    CACHE_AVAILABLE = False
+    logger.warning(f"⚠️ Cache Redis no disponible: {str(e)}")
+
+    def cache(expire=None):
+        """Decorador no-op cuando fastapi-cache2/redis no están instalados"""
+        def decorator(func):
+            return func
+        return decorator
+
+# MODIFICADO: Response class propia sobre orjson. Soporta datetime, UUID y
+# numpy de forma nativa (sin .isoformat()/casts manuales en los handlers)
+class ORJSONResponse(JSONResponse):
+    """JSON response serializada con orjson"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+# AÑADIDO: parseo del body entrante también con orjson (más rápido y con
+# menos presión de alocación que el json de stdlib que usa Starlette)
+class ORJSONRequest(Request):
+    async def json(self):
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            self._json = orjson.loads(body)
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """Route class que sustituye el Request por ORJSONRequest"""
+
+    def get_route_handler(self):
+        original_route_handler = super().get_route_handler()
+
+        async def custom_route_handler(request: Request):
+            request = ORJSONRequest(request.scope, request.receive)
+            return await original_route_handler(request)
+
+        return custom_route_handler
+
+
 # Initialize FastAPI with professional configuration
 app = FastAPI(
     title="🛡️ Fraud Detection API - Director Level",
@@ -63,6 +127,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,  # MODIFICADO: serialización JSON con orjson
     openapi_tags=[
         {"name": "fraud-detection", "description": "Core fraud detection endpoints"},
         {"name": "business-intelligence", "description": "Executive dashboard metrics"},
@@ -71,6 +136,10 @@ app = FastAPI(
     ]
 )
 
+# AÑADIDO: todos los endpoints parsean el body con orjson (debe fijarse
+# antes de declarar las rutas para que aplique a los decoradores @app.*)
+app.router.route_class = ORJSONRoute
+
 # Add CORS middleware for web integration
 app.add_middleware(
     CORSMiddleware,
@@ -80,6 +149,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# AÑADIDO: Compresión GZip para las respuestas analíticas multi-KB
+# (/model/features, /business/risk-segments, /business/metrics). El umbral
+# de 1KB deja pasar sin comprimir las respuestas pequeñas como /health.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 # ============================================================================
 # REQUEST/RESPONSE MODELS
 # ============================================================================
@@ -123,6 +197,7 @@ class FraudScore(BaseModel):
     confidence: str = Field(description="Confidence level in prediction")
     key_risk_factors: List[str] = Field(description="List of identified risk factors")
     scorecard_breakdown: Dict[str, int] = Field(description="Detailed scorecard breakdown")
+    points_adjustment: int = Field(default=0, description="Total points added/subtracted vs base score")
     business_recommendation: str = Field(description="Business action recommendation")
     processing_time_ms: float = Field(description="API processing time in milliseconds")
     model_version: str = Field(description="Model version used")
@@ -186,62 +261,91 @@ class FallbackFraudEngine:
             'luxury_price': 0.08,
             'rural_area': 0.05,
         }
+
+        # MODIFICADO: Tablas de lookup precompiladas (categoría -> puntos,
+        # delta de probabilidad, factor de riesgo). El scoring por claim se
+        # reduce a seis dict lookups O(1) en lugar de cadenas de if/elif.
+        self.tbl_timing = {
+            '1 to 7': (-25, self.risk_weights['urgent_claim'],
+                       "🚨 Claim reportado muy rápidamente (1-7 días)"),
+        }
+        self.default_timing = (10, 0.0, None)
+
+        # Tipos de póliza canónicos con cobertura All Perils: membership O(1)
+        # en lugar de búsqueda de substring por request
+        self.all_perils = frozenset({'Sedan - All Perils', 'Sport - All Perils',
+                                     'Utility - All Perils'})
+        self.tbl_policy = {
+            'All Perils': (-15, self.risk_weights['complex_policy'],
+                           "🔍 Póliza All Perils (mayor complejidad)"),
+            'other': (5, 0.0, None),
+        }
+
+        premium_msg = "💰 Vehículo de marca premium"
+        self.tbl_make = {
+            'BMW': (-20, self.risk_weights['premium_vehicle'], premium_msg),
+            'Mercedes': (-20, self.risk_weights['premium_vehicle'], premium_msg),
+            'Audi': (-20, self.risk_weights['premium_vehicle'], premium_msg),
+        }
+        self.default_make = (5, 0.0, None)
+
+        young_msg = "👤 Conductor joven (alto riesgo)"
+        self.tbl_age = {
+            '18 to 20': (-15, self.risk_weights['young_driver'], young_msg),
+            '21 to 25': (-15, self.risk_weights['young_driver'], young_msg),
+        }
+        self.default_age = (5, 0.0, None)
+
+        luxury_msg = "💎 Vehículo de alto valor"
+        self.tbl_price = {
+            '60000 to 69000': (-10, self.risk_weights['luxury_price'], luxury_msg),
+            'more than 69000': (-10, self.risk_weights['luxury_price'], luxury_msg),
+        }
+        self.default_price = (0, 0.0, None)
+
+        self.tbl_area = {
+            'Rural': (-8, self.risk_weights['rural_area'],
+                      "📍 Accidente en área rural"),
+        }
+        self.default_area = (2, 0.0, None)
+
         logger.info("✅ FallbackFraudEngine inicializado")
     
     def calculate_fraud_score(self, claim_data):
         """Calculate fraud score using business rules"""
-        start_time = datetime.now()
-        
-        # Convert Pydantic model to dict if needed
-        if hasattr(claim_data, 'dict'):
-            claim_data = claim_data.dict()
+        start_ns = time.perf_counter_ns()
+
+        # MODIFICADO: Leer los campos directamente del modelo Pydantic (o de
+        # un dict) sin materializar un dict completo por request
+        if isinstance(claim_data, dict):
+            get_field = claim_data.get
+        else:
+            def get_field(field, default=None):
+                return getattr(claim_data, field, default)
         
         fraud_prob = self.base_fraud_rate
         risk_factors = []
         scorecard = {"Base Score": self.base_score}
-        
-        # Apply business rules
-        if claim_data.get('Days_Policy_Claim') == '1 to 7':
-            fraud_prob += self.risk_weights['urgent_claim']
-            risk_factors.append("🚨 Claim reportado muy rápidamente (1-7 días)")
-            scorecard["Claim Timing"] = -25
-        else:
-            scorecard["Claim Timing"] = 10
-            
-        if 'All Perils' in claim_data.get('PolicyType', ''):
-            fraud_prob += self.risk_weights['complex_policy']
-            risk_factors.append("🔍 Póliza All Perils (mayor complejidad)")
-            scorecard["Policy Type"] = -15
-        else:
-            scorecard["Policy Type"] = 5
-            
-        if claim_data.get('Make') in ['BMW', 'Mercedes', 'Audi']:
-            fraud_prob += self.risk_weights['premium_vehicle']
-            risk_factors.append("💰 Vehículo de marca premium")
-            scorecard["Vehicle Make"] = -20
-        else:
-            scorecard["Vehicle Make"] = 5
-            
-        if claim_data.get('AgeOfPolicyHolder') in ['18 to 20', '21 to 25']:
-            fraud_prob += self.risk_weights['young_driver']
-            risk_factors.append("👤 Conductor joven (alto riesgo)")
-            scorecard["Driver Age"] = -15
-        else:
-            scorecard["Driver Age"] = 5
-            
-        if claim_data.get('VehiclePrice') in ['60000 to 69000', 'more than 69000']:
-            fraud_prob += self.risk_weights['luxury_price']
-            risk_factors.append("💎 Vehículo de alto valor")
-            scorecard["Vehicle Value"] = -10
-        else:
-            scorecard["Vehicle Value"] = 0
-            
-        if claim_data.get('AccidentArea') == 'Rural':
-            fraud_prob += self.risk_weights['rural_area']
-            risk_factors.append("📍 Accidente en área rural")
-            scorecard["Accident Area"] = -8
-        else:
-            scorecard["Accident Area"] = 2
+
+        # MODIFICADO: Aplicar las reglas de negocio vía las tablas
+        # precompiladas en __init__ (seis lookups O(1) + una suma)
+        policy_key = 'All Perils' if get_field('PolicyType') in self.all_perils else 'other'
+
+        rules = [
+            ("Claim Timing", self.tbl_timing.get(get_field('Days_Policy_Claim'), self.default_timing)),
+            ("Policy Type", self.tbl_policy[policy_key]),
+            ("Vehicle Make", self.tbl_make.get(get_field('Make'), self.default_make)),
+            ("Driver Age", self.tbl_age.get(get_field('AgeOfPolicyHolder'), self.default_age)),
+            ("Vehicle Value", self.tbl_price.get(get_field('VehiclePrice'), self.default_price)),
+            ("Accident Area", self.tbl_area.get(get_field('AccidentArea'), self.default_area)),
+        ]
+
+        for component, (points, prob_delta, factor) in rules:
+            scorecard[component] = points
+            fraud_prob += prob_delta
+            # Acotar a 4 factores durante la acumulación (sin slice al final)
+            if factor is not None and len(risk_factors) < 4:
+                risk_factors.append(factor)
         
         # Calculate final metrics
         fraud_prob = min(0.95, max(0.005, fraud_prob))
@@ -262,37 +366,139 @@ class FallbackFraudEngine:
             confidence = "High"
             recommendation = "STANDARD PROCESSING - Normal risk profile"
         
-        processing_time = (datetime.now() - start_time).total_seconds() * 1000
-        
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6
+
         return {
             'fraud_probability': round(fraud_prob, 3),
             'risk_score': int(final_score),
             'risk_level': risk_level,
             'confidence': confidence,
-            'key_risk_factors': risk_factors[:4],
+            'key_risk_factors': risk_factors,
             'scorecard_breakdown': scorecard,
+            'points_adjustment': int(points_adjustment),
             'business_recommendation': recommendation,
             'processing_time_ms': round(processing_time, 2),
             'model_version': "1.0.0-fallback",
             'timestamp': datetime.now().isoformat()
         }
     
+    def calculate_fraud_score_batch(self, df: pd.DataFrame):
+        """Calculate fraud scores for a whole batch using vectorized operations
+
+        Evalúa todas las reglas de negocio con máscaras booleanas sobre el
+        DataFrame completo en lugar de despachar claim por claim en Python.
+        """
+        start_ns = time.perf_counter_ns()
+        n = len(df)
+
+        # Máscaras booleanas calculadas una sola vez para todo el batch
+        urgent = df.get('Days_Policy_Claim', pd.Series('', index=df.index)).eq('1 to 7')
+        all_perils = df.get('PolicyType', pd.Series('', index=df.index)).isin(self.all_perils)
+        premium = df.get('Make', pd.Series('', index=df.index)).isin(['BMW', 'Mercedes', 'Audi'])
+        young = df.get('AgeOfPolicyHolder', pd.Series('', index=df.index)).isin(['18 to 20', '21 to 25'])
+        luxury = df.get('VehiclePrice', pd.Series('', index=df.index)).isin(['60000 to 69000', 'more than 69000'])
+        rural = df.get('AccidentArea', pd.Series('', index=df.index)).eq('Rural')
+
+        fraud_prob = np.clip(
+            self.base_fraud_rate
+            + urgent * self.risk_weights['urgent_claim']
+            + all_perils * self.risk_weights['complex_policy']
+            + premium * self.risk_weights['premium_vehicle']
+            + young * self.risk_weights['young_driver']
+            + luxury * self.risk_weights['luxury_price']
+            + rural * self.risk_weights['rural_area'],
+            0.005, 0.95
+        )
+        fraud_prob = np.asarray(fraud_prob)
+
+        # Puntos por componente (mismos valores que el camino por claim)
+        pts_timing = np.where(urgent, -25, 10)
+        pts_policy = np.where(all_perils, -15, 5)
+        pts_make = np.where(premium, -20, 5)
+        pts_age = np.where(young, -15, 5)
+        pts_price = np.where(luxury, -10, 0)
+        pts_area = np.where(rural, -8, 2)
+
+        final_score = (self.base_score + pts_timing + pts_policy + pts_make
+                       + pts_age + pts_price + pts_area)
+
+        risk_level = pd.cut(final_score, [-np.inf, 580, 620, np.inf],
+                            labels=['HIGH', 'MEDIUM', 'LOW']).astype(str)
+
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6
+        per_claim_ms = round(processing_time / max(n, 1), 2)
+        timestamp = datetime.now().isoformat()
+
+        results = []
+        for i in range(n):
+            risk_factors = []
+            if urgent.iloc[i]:
+                risk_factors.append("🚨 Claim reportado muy rápidamente (1-7 días)")
+            if all_perils.iloc[i]:
+                risk_factors.append("🔍 Póliza All Perils (mayor complejidad)")
+            if premium.iloc[i]:
+                risk_factors.append("💰 Vehículo de marca premium")
+            if young.iloc[i]:
+                risk_factors.append("👤 Conductor joven (alto riesgo)")
+            if luxury.iloc[i]:
+                risk_factors.append("💎 Vehículo de alto valor")
+            if rural.iloc[i]:
+                risk_factors.append("📍 Accidente en área rural")
+
+            level = risk_level[i]
+            if level == 'HIGH':
+                confidence = "High"
+                recommendation = "INVESTIGATE IMMEDIATELY - Multiple high-risk indicators"
+            elif level == 'MEDIUM':
+                confidence = "Medium"
+                recommendation = "DETAILED REVIEW REQUIRED - Some concerning factors"
+            else:
+                confidence = "High"
+                recommendation = "STANDARD PROCESSING - Normal risk profile"
+
+            results.append({
+                'fraud_probability': round(float(fraud_prob[i]), 3),
+                'risk_score': int(final_score[i]),
+                'risk_level': level,
+                'confidence': confidence,
+                'key_risk_factors': risk_factors[:4],
+                'scorecard_breakdown': {
+                    "Base Score": self.base_score,
+                    "Claim Timing": int(pts_timing[i]),
+                    "Policy Type": int(pts_policy[i]),
+                    "Vehicle Make": int(pts_make[i]),
+                    "Driver Age": int(pts_age[i]),
+                    "Vehicle Value": int(pts_price[i]),
+                    "Accident Area": int(pts_area[i])
+                },
+                'points_adjustment': int(final_score[i] - self.base_score),
+                'business_recommendation': recommendation,
+                'processing_time_ms': per_claim_ms,
+                'model_version': "1.0.0-fallback",
+                'timestamp': timestamp
+            })
+
+        return results
+
+    # AÑADIDO: payload estático de /model/info como constante de clase
+    _MODEL_INFO = {
+        "model_type": "Business Rules Engine (Fallback Mode)",
+        "version": "1.0.0-fallback",
+        "performance": {
+            "auc": 0.847,
+            "precision_at_10": 0.623,
+            "ks_statistic": 0.412
+        },
+        "business_impact": {
+            "annual_savings": "$20M+",
+            "detection_speed": "Real-time vs 45 days",
+            "investigation_efficiency": "+70%"
+        }
+    }
+
     def get_model_info(self):
         """Get model information"""
-        return {
-            "model_type": "Business Rules Engine (Fallback Mode)",
-            "version": "1.0.0-fallback",
-            "performance": {
-                "auc": 0.847,
-                "precision_at_10": 0.623,
-                "ks_statistic": 0.412
-            },
-            "business_impact": {
-                "annual_savings": "$20M+",
-                "detection_speed": "Real-time vs 45 days",
-                "investigation_efficiency": "+70%"
-            }
-        }
+        return self._MODEL_INFO
 
 # ============================================================================
 # INITIALIZE FRAUD ENGINE
@@ -305,13 +511,22 @@ if ENGINE_AVAILABLE:
     try:
         # Verificar que existan los modelos antes de cargar
         models_path = os.getenv('MODELS_PATH', 'models')
-        required_files = ['logistic_model.pkl', 'xgb_model.pkl', 'woe_mappings.pkl', 
-                         'scorecard.pkl', 'metadata.pkl']
-        
         missing_files = []
-        for file in required_files:
-            if not os.path.exists(os.path.join(models_path, file)):
-                missing_files.append(file)
+
+        # MODIFICADO: los artefactos sklearn/numpy pueden venir como un
+        # bundle único o como los cuatro pickles del layout antiguo
+        if not os.path.exists(os.path.join(models_path, 'bundle.pkl')):
+            legacy_files = ['logistic_model.pkl', 'woe_mappings.pkl',
+                           'scorecard.pkl', 'metadata.pkl']
+            for file in legacy_files:
+                if not os.path.exists(os.path.join(models_path, file)):
+                    missing_files.append(file)
+
+        # MODIFICADO: el booster puede estar en formato nativo UBJ o como
+        # pickle de versiones anteriores
+        if not (os.path.exists(os.path.join(models_path, 'xgb_model.ubj'))
+                or os.path.exists(os.path.join(models_path, 'xgb_model.pkl'))):
+            missing_files.append('xgb_model.ubj')
         
         if missing_files:
             logger.warning(f"⚠️ Archivos de modelo faltantes: {missing_files}")
@@ -326,6 +541,73 @@ if ENGINE_AVAILABLE:
 else:
     fraud_engine = FallbackFraudEngine()
 
+# AÑADIDO: Capacidad de scoring vectorizado resuelta una sola vez
+ENGINE_HAS_BATCH = hasattr(fraud_engine, 'calculate_fraud_score_batch')
+
+# ============================================================================
+# MICRO-BATCHING DE /predict
+# ============================================================================
+
+# AÑADIDO: Cola de micro-batching para /predict. Requests concurrentes que
+# llegan dentro de una ventana corta se agrupan y se puntúan como un solo
+# batch vectorizado, manteniendo la ventana muy por debajo del SLO de 100ms.
+MICRO_BATCH_MAX = int(os.getenv("MICRO_BATCH_MAX", "64"))
+MICRO_BATCH_WAIT_MS = float(os.getenv("MICRO_BATCH_WAIT_MS", "5"))
+MICRO_BATCH_ENABLED = os.getenv("MICRO_BATCH_ENABLED", "1") == "1"
+
+predict_queue = None
+# MODIFICADO: referencia fuerte a la task del batcher; el event loop solo
+# guarda weak refs y sin esto el GC puede matar el batcher en caliente
+_batcher_task = None
+
+
+async def micro_batcher():
+    """Background task: agrupa requests de /predict en micro-batches"""
+    loop = asyncio.get_running_loop()
+
+    while True:
+        batch = [await predict_queue.get()]
+        deadline = loop.time() + MICRO_BATCH_WAIT_MS / 1000
+
+        # Drenar la cola hasta MICRO_BATCH_MAX items o hasta agotar la ventana
+        while len(batch) < MICRO_BATCH_MAX:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(predict_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        claims = [claim for claim, _ in batch]
+
+        try:
+            if len(batch) > 1 and ENGINE_HAS_BATCH:
+                claims_df = pd.DataFrame([claim.model_dump() for claim in claims])
+                results = await asyncio.to_thread(
+                    fraud_engine.calculate_fraud_score_batch, claims_df
+                )
+            else:
+                results = await asyncio.gather(
+                    *[asyncio.to_thread(fraud_engine.calculate_fraud_score, claim)
+                      for claim in claims]
+                )
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+
+async def score_via_micro_batch(claim_data):
+    """Encola un claim y espera su resultado del micro-batcher"""
+    future = asyncio.get_running_loop().create_future()
+    await predict_queue.put((claim_data, future))
+    return await future
+
 # ============================================================================
 # CORE FRAUD DETECTION ENDPOINTS
 # ============================================================================
@@ -346,17 +628,21 @@ async def predict_fraud(claim_data: ClaimData):
     - Key risk factors identified
     """
     try:
-        logger.info(f"Processing fraud prediction for claim: {claim_data.Make} {claim_data.PolicyType}")
-        
-        # Convert to dictionary for processing
-        claim_dict = claim_data.dict()
+        # MODIFICADO: Logging lazy (%-style): no formatea si el nivel está apagado
+        logger.info("Processing fraud prediction for claim: %s %s", claim_data.Make, claim_data.PolicyType)
         
-        # Calculate fraud score
-        result = fraud_engine.calculate_fraud_score(claim_dict)
+        # MODIFICADO: Pasar el modelo Pydantic directamente (sin .dict());
+        # puntuar vía el micro-batcher si está activo, o en el threadpool
+        if predict_queue is not None:
+            result = await score_via_micro_batch(claim_data)
+        else:
+            result = await asyncio.to_thread(fraud_engine.calculate_fraud_score, claim_data)
         
-        logger.info(f"Fraud prediction completed: Risk={result['risk_level']}, Score={result['risk_score']}")
+        logger.info("Fraud prediction completed: Risk=%s, Score=%s", result['risk_level'], result['risk_score'])
         
-        return FraudScore(**result)
+        # MODIFICADO: model_construct evita re-validar campos que ya produce
+        # nuestro propio engine con el formato correcto
+        return FraudScore.model_construct(**result)
         
     except Exception as e:
         logger.error(f"Error in fraud prediction: {str(e)}")
@@ -374,19 +660,25 @@ async def predict_fraud_batch(batch_data: BatchClaimData):
     Optimized for high-volume processing with summary statistics.
     """
     try:
-        start_time = datetime.now()
-        results = []
-        high_risk_count = 0
-        
-        for claim in batch_data.claims:
-            claim_dict = claim.dict()
-            result = fraud_engine.calculate_fraud_score(claim_dict)
-            results.append(FraudScore(**result))
-            
-            if result['risk_level'] == 'HIGH':
-                high_risk_count += 1
-        
-        total_time = (datetime.now() - start_time).total_seconds() * 1000
+        start_ns = time.perf_counter_ns()
+
+        # MODIFICADO: Usar el scoring vectorizado cuando el engine lo soporta;
+        # si no, procesar los claims en paralelo sobre el threadpool
+        if ENGINE_HAS_BATCH:
+            claims_df = pd.DataFrame([claim.model_dump() for claim in batch_data.claims])
+            results_raw = await asyncio.to_thread(
+                fraud_engine.calculate_fraud_score_batch, claims_df
+            )
+        else:
+            results_raw = await asyncio.gather(
+                *(asyncio.to_thread(fraud_engine.calculate_fraud_score, claim)
+                  for claim in batch_data.claims)
+            )
+
+        results = [FraudScore.model_construct(**result) for result in results_raw]
+        high_risk_count = sum(1 for result in results_raw if result['risk_level'] == 'HIGH')
+
+        total_time = (time.perf_counter_ns() - start_ns) / 1e6
         
         return BatchFraudScores(
             results=results,
@@ -399,6 +691,153 @@ async def predict_fraud_batch(batch_data: BatchClaimData):
         logger.error(f"Error in batch prediction: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error en predicción batch: {str(e)}")
 
+# ============================================================================
+# PAYLOADS ESTÁTICOS
+# ============================================================================
+
+# AÑADIDO: timestamp ISO cacheado a resolución de 1 segundo; los endpoints
+# de lectura no necesitan precisión sub-segundo y esto evita un
+# datetime.now().isoformat() por request bajo carga
+_TS_CACHE = [0, ""]
+
+def _iso_now_1s():
+    ti = int(time.time())
+    if ti != _TS_CACHE[0]:
+        _TS_CACHE[0] = ti
+        _TS_CACHE[1] = datetime.fromtimestamp(ti).isoformat()
+    return _TS_CACHE[1]
+
+# AÑADIDO: Payloads constantes construidos una sola vez al importar el
+# módulo, en lugar de reconstruir los literales dict/list en cada request
+
+_RISK_SEGMENTS_PAYLOAD = {
+    "high_risk_segments": [
+        {
+            "segment": "Quick Claims (1-7 days)",
+            "fraud_rate": "18.5%",
+            "volume": "8% of total claims",
+            "priority": "Critical",
+            "estimated_annual_impact": "$2.3M"
+        },
+        {
+            "segment": "Premium Vehicles (BMW, Mercedes, Audi)",
+            "fraud_rate": "14.2%",
+            "volume": "12% of total claims", 
+            "priority": "High",
+            "estimated_annual_impact": "$1.8M"
+        },
+        {
+            "segment": "Young Drivers (18-25)",
+            "fraud_rate": "11.8%",
+            "volume": "17% of total claims",
+            "priority": "High",
+            "estimated_annual_impact": "$1.5M"
+        },
+        {
+            "segment": "All Perils Policies", 
+            "fraud_rate": "10.3%",
+            "volume": "25% of total claims",
+            "priority": "Medium",
+            "estimated_annual_impact": "$1.2M"
+        }
+    ],
+    "business_recommendations": [
+        "Implement automatic flagging for claims reported within 7 days",
+        "Enhanced verification protocols for premium vehicle claims",
+        "Age-based risk scoring with additional verification steps",
+        "Specialized training for All Perils policy investigations",
+        "Real-time alerts for combinations of high-risk factors"
+    ],
+    "total_addressable_savings": "$6.8M annually through targeted interventions"
+}
+
+# AÑADIDO: MappingProxyType hace el payload read-only; se aloca una sola
+# vez y ningún handler puede mutarlo por accidente
+_FEATURE_IMPORTANCE_PAYLOAD = MappingProxyType({
+    "top_features": [
+        {
+            "feature": "Days_Policy_Claim_WoE",
+            "importance": 0.234,
+            "business_interpretation": "Time between policy start and claim filing",
+            "risk_direction": "Shorter time = Higher risk"
+        },
+        {
+            "feature": "PolicyType_WoE", 
+            "importance": 0.187,
+            "business_interpretation": "Complexity and coverage type of policy",
+            "risk_direction": "All Perils policies = Higher risk"
+        },
+        {
+            "feature": "Make_WoE",
+            "importance": 0.156,
+            "business_interpretation": "Vehicle manufacturer premium positioning",
+            "risk_direction": "Premium brands = Higher risk"
+        },
+        {
+            "feature": "AgeOfPolicyHolder_WoE",
+            "importance": 0.143,
+            "business_interpretation": "Age demographic risk profile",
+            "risk_direction": "Younger drivers = Higher risk"
+        },
+        {
+            "feature": "VehiclePrice_WoE",
+            "importance": 0.128,
+            "business_interpretation": "Vehicle value and attractiveness for fraud",
+            "risk_direction": "Higher value = Higher risk"
+        }
+    ],
+    "feature_interactions": [
+        "Young drivers + Premium vehicles = 2.3x risk multiplier",
+        "Quick claims + All Perils policies = 2.1x risk multiplier", 
+        "Rural accidents + Luxury vehicles = 1.8x risk multiplier"
+    ],
+    "business_insights": [
+        "Claims filed within 7 days show 4.8x higher fraud rate",
+        "All Perils policies account for 32% of confirmed fraud cases",
+        "Premium vehicle brands represent 45% of high-value fraud",
+        "Combined risk factors create exponential risk increases"
+    ]
+})
+
+_ROOT_PAYLOAD = {
+    "message": "🛡️ Fraud Detection API - Director Level Solution",
+    "version": "1.0.0",
+    "developer": "Director de Datos AI Senior",
+    "documentation": "/docs",
+    "health_check": "/health",
+    "main_endpoint": "/predict",
+    "business_metrics": "/business/metrics",
+    "description": "Enterprise-grade fraud detection with real-time scoring and executive dashboards",
+    "status": "✅ Operational"
+}
+
+# AÑADIDO: Pre-serializar los payloads estáticos a bytes con orjson una
+# sola vez; los handlers devuelven el buffer directamente sin pasar por
+# jsonable_encoder + dumps en cada request
+_RISK_SEGMENTS_JSON = orjson.dumps(_RISK_SEGMENTS_PAYLOAD)
+_FEATURE_IMPORTANCE_JSON = orjson.dumps(dict(_FEATURE_IMPORTANCE_PAYLOAD))
+_ROOT_JSON = orjson.dumps(_ROOT_PAYLOAD)
+
+# Esqueleto de /health: todo es estático salvo el timestamp, que se
+# empalma por request sobre el dict base
+_HEALTH_SKELETON = {
+    "status": "healthy",
+    "service": "Fraud Detection API",
+    "version": "1.0.0",
+    "uptime": "99.9%",
+    "response_time": "< 100ms",
+    "model_status": "ML Engine Active" if ENGINE_AVAILABLE and isinstance(fraud_engine, FraudDetectionEngine) else "Fallback Mode",
+    "dependencies": {
+        "database": "connected",
+        "ml_engine": "operational" if ENGINE_AVAILABLE else "fallback",
+        "monitoring": "active"
+    }
+}
+
+# AÑADIDO: generador de numpy a nivel de módulo para draws batched en
+# /business/metrics (una llamada C en vez de ~15 llamadas a random.*)
+_rng = np.random.default_rng()
+
 # ============================================================================
 # BUSINESS INTELLIGENCE ENDPOINTS
 # ============================================================================
@@ -407,35 +846,46 @@ async def predict_fraud_batch(batch_data: BatchClaimData):
          tags=["business-intelligence"],
          summary="Executive Dashboard Metrics",
          description="Real-time business metrics for executive dashboards")
+@cache(expire=60)
 async def get_business_metrics():
     """
     📊 **Executive Dashboard**: Real-time business KPIs
     
     Provides current performance metrics for C-level reporting.
     """
-    import random
-    
+    # MODIFICADO: todos los valores aleatorios se generan en dos draws
+    # batched del generador de numpy en lugar de 15 llamadas individuales
+    ints = _rng.integers(
+        [850, 15, 200_000, 45, 25_000, 1_500_000, 45],
+        [1200, 35, 450_000, 85, 35_000, 2_200_000, 85],
+        endpoint=True
+    )
+    floats = _rng.uniform(
+        [8.0, 62.0, 68.0, 12.0, 84.0],
+        [15.0, 68.0, 75.0, 18.0, 87.0]
+    )
+
     # Generate realistic business metrics
     metrics = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _iso_now_1s(),
         "daily_metrics": {
-            "claims_processed": random.randint(850, 1200),
-            "fraud_cases_detected": random.randint(15, 35),
-            "potential_savings": random.randint(200_000, 450_000),
-            "avg_response_time_ms": random.randint(45, 85),
-            "high_risk_percentage": round(random.uniform(8, 15), 1)
+            "claims_processed": int(ints[0]),
+            "fraud_cases_detected": int(ints[1]),
+            "potential_savings": int(ints[2]),
+            "avg_response_time_ms": int(ints[3]),
+            "high_risk_percentage": round(float(floats[0]), 1)
         },
         "monthly_metrics": {
-            "total_claims": random.randint(25_000, 35_000),
-            "fraud_prevention_rate": round(random.uniform(62, 68), 1),
-            "investigation_efficiency": round(random.uniform(68, 75), 1),
-            "cost_savings": random.randint(1_500_000, 2_200_000),
-            "false_positive_rate": round(random.uniform(12, 18), 1)
+            "total_claims": int(ints[4]),
+            "fraud_prevention_rate": round(float(floats[1]), 1),
+            "investigation_efficiency": round(float(floats[2]), 1),
+            "cost_savings": int(ints[5]),
+            "false_positive_rate": round(float(floats[3]), 1)
         },
         "system_performance": {
             "uptime_percentage": 99.9,
-            "accuracy_percentage": round(random.uniform(84, 87), 1),
-            "processing_speed_ms": random.randint(45, 85),
+            "accuracy_percentage": round(float(floats[4]), 1),
+            "processing_speed_ms": int(ints[6]),
             "compliance_score": 100.0,
             "model_drift_status": "Stable"
         },
@@ -457,70 +907,27 @@ async def get_risk_segments():
     """
     🎯 **Risk Intelligence**: Segment analysis for strategic decision making
     """
-    segments = {
-        "high_risk_segments": [
-            {
-                "segment": "Quick Claims (1-7 days)",
-                "fraud_rate": "18.5%",
-                "volume": "8% of total claims",
-                "priority": "Critical",
-                "estimated_annual_impact": "$2.3M"
-            },
-            {
-                "segment": "Premium Vehicles (BMW, Mercedes, Audi)",
-                "fraud_rate": "14.2%",
-                "volume": "12% of total claims", 
-                "priority": "High",
-                "estimated_annual_impact": "$1.8M"
-            },
-            {
-                "segment": "Young Drivers (18-25)",
-                "fraud_rate": "11.8%",
-                "volume": "17% of total claims",
-                "priority": "High",
-                "estimated_annual_impact": "$1.5M"
-            },
-            {
-                "segment": "All Perils Policies", 
-                "fraud_rate": "10.3%",
-                "volume": "25% of total claims",
-                "priority": "Medium",
-                "estimated_annual_impact": "$1.2M"
-            }
-        ],
-        "business_recommendations": [
-            "Implement automatic flagging for claims reported within 7 days",
-            "Enhanced verification protocols for premium vehicle claims",
-            "Age-based risk scoring with additional verification steps",
-            "Specialized training for All Perils policy investigations",
-            "Real-time alerts for combinations of high-risk factors"
-        ],
-        "total_addressable_savings": "$6.8M annually through targeted interventions"
-    }
-    
-    return segments
+    return Response(content=_RISK_SEGMENTS_JSON, media_type="application/json")
 
 # ============================================================================
 # MODEL INFORMATION ENDPOINTS
 # ============================================================================
 
-@app.get("/model/info",
-         response_model=ModelInfo,
-         tags=["model-info"],
-         summary="Model Information",
-         description="Comprehensive model information and performance metrics")
-async def model_info():
-    """
-    🤖 **Model Intelligence**: Technical specifications and performance
+def _build_model_info_json():
+    """Construye y pre-serializa la respuesta de /model/info una sola vez
+
+    El contenido es estático durante la vida del proceso, así que se valida
+    con Pydantic aquí y los requests sirven los bytes directamente sin
+    re-validación ni model_dump por llamada.
     """
-    info = fraud_engine.get_model_info()
-    
+    info = fraud_engine.get_model_info() if fraud_engine else {}
+
     # Adaptar la respuesta al formato esperado
     if isinstance(info, dict) and 'performance' in info:
         performance = info['performance']
     else:
         performance = {"auc": 0.847, "precision_at_10": 0.623, "ks_statistic": 0.412}
-    
+
     model_info_response = ModelInfo(
         model_type=info.get("model_type", "Dual Model: Logistic + XGBoost"),
         version=info.get("version", "1.0.0"),
@@ -547,8 +954,22 @@ async def model_info():
         features_count=15,
         training_data_size="5,000+ claims with comprehensive validation"
     )
-    
-    return model_info_response
+
+    return orjson.dumps(model_info_response.model_dump())
+
+_MODEL_INFO_JSON = _build_model_info_json()
+
+@app.get("/model/info",
+         tags=["model-info"],
+         summary="Model Information",
+         description="Comprehensive model information and performance metrics")
+async def model_info():
+    """
+    🤖 **Model Intelligence**: Technical specifications and performance
+    """
+    # MODIFICADO: payload validado y serializado una vez al arrancar; sin
+    # response_model para evitar la re-validación de Pydantic por request
+    return Response(content=_MODEL_INFO_JSON, media_type="application/json")
 
 @app.get("/model/features",
          tags=["model-info"],
@@ -558,53 +979,7 @@ async def get_feature_importance():
     """
     🔍 **Feature Intelligence**: Understanding what drives predictions
     """
-    features = {
-        "top_features": [
-            {
-                "feature": "Days_Policy_Claim_WoE",
-                "importance": 0.234,
-                "business_interpretation": "Time between policy start and claim filing",
-                "risk_direction": "Shorter time = Higher risk"
-            },
-            {
-                "feature": "PolicyType_WoE", 
-                "importance": 0.187,
-                "business_interpretation": "Complexity and coverage type of policy",
-                "risk_direction": "All Perils policies = Higher risk"
-            },
-            {
-                "feature": "Make_WoE",
-                "importance": 0.156,
-                "business_interpretation": "Vehicle manufacturer premium positioning",
-                "risk_direction": "Premium brands = Higher risk"
-            },
-            {
-                "feature": "AgeOfPolicyHolder_WoE",
-                "importance": 0.143,
-                "business_interpretation": "Age demographic risk profile",
-                "risk_direction": "Younger drivers = Higher risk"
-            },
-            {
-                "feature": "VehiclePrice_WoE",
-                "importance": 0.128,
-                "business_interpretation": "Vehicle value and attractiveness for fraud",
-                "risk_direction": "Higher value = Higher risk"
-            }
-        ],
-        "feature_interactions": [
-            "Young drivers + Premium vehicles = 2.3x risk multiplier",
-            "Quick claims + All Perils policies = 2.1x risk multiplier", 
-            "Rural accidents + Luxury vehicles = 1.8x risk multiplier"
-        ],
-        "business_insights": [
-            "Claims filed within 7 days show 4.8x higher fraud rate",
-            "All Perils policies account for 32% of confirmed fraud cases",
-            "Premium vehicle brands represent 45% of high-value fraud",
-            "Combined risk factors create exponential risk increases"
-        ]
-    }
-    
-    return features
+    return Response(content=_FEATURE_IMPORTANCE_JSON, media_type="application/json")
 
 # ============================================================================
 # ADMINISTRATIVE ENDPOINTS
@@ -618,23 +993,9 @@ async def health_check():
     """
     🏥 **Health Monitor**: System status and availability
     """
-    # Verificar estado del engine
-    engine_status = "ML Engine Active" if isinstance(fraud_engine, FraudDetectionEngine) else "Fallback Mode"
-    
-    return {
-        "status": "healthy",
-        "service": "Fraud Detection API",
-        "version": "1.0.0",
-        "timestamp": datetime.now().isoformat(),
-        "uptime": "99.9%",
-        "response_time": "< 100ms",
-        "model_status": engine_status,
-        "dependencies": {
-            "database": "connected",
-            "ml_engine": "operational" if ENGINE_AVAILABLE else "fallback", 
-            "monitoring": "active"
-        }
-    }
+    # MODIFICADO: solo el timestamp es dinámico; el resto viene del
+    # esqueleto pre-construido
+    return ORJSONResponse({**_HEALTH_SKELETON, "timestamp": _iso_now_1s()})
 
 @app.get("/",
          tags=["admin"],
@@ -644,17 +1005,7 @@ async def root():
     """
     🏠 **API Home**: Welcome and navigation
     """
-    return {
-        "message": "🛡️ Fraud Detection API - Director Level Solution",
-        "version": "1.0.0",
-        "developer": "Director de Datos AI Senior",
-        "documentation": "/docs",
-        "health_check": "/health",
-        "main_endpoint": "/predict",
-        "business_metrics": "/business/metrics",
-        "description": "Enterprise-grade fraud detection with real-time scoring and executive dashboards",
-        "status": "✅ Operational"
-    }
+    return Response(content=_ROOT_JSON, media_type="application/json")
 
 # ============================================================================
 # STARTUP EVENT
@@ -663,7 +1014,25 @@ async def root():
 @app.on_event("startup")
 async def startup_event():
     """Initialize application on startup"""
+    global predict_queue, _batcher_task
+
     logger.info("🚀 Fraud Detection API starting up...")
+
+    # AÑADIDO: Inicializar el cache Redis si está disponible; si Redis no
+    # responde, los endpoints siguen funcionando sin cache
+    if CACHE_AVAILABLE:
+        try:
+            redis = aioredis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))
+            FastAPICache.init(RedisBackend(redis), prefix="fraud-api")
+            logger.info("🗄️ Cache Redis inicializado")
+        except Exception as e:
+            logger.warning(f"⚠️ Redis no disponible, endpoints sin cache: {str(e)}")
+
+    # AÑADIDO: Arrancar el micro-batcher de /predict
+    if MICRO_BATCH_ENABLED:
+        predict_queue = asyncio.Queue()
+        _batcher_task = asyncio.create_task(micro_batcher())
+        logger.info(f"🧺 Micro-batching activo (max={MICRO_BATCH_MAX}, wait={MICRO_BATCH_WAIT_MS}ms)")
     logger.info(f"🛡️ Director Level Solution initialized")
     logger.info(f"📊 Business Intelligence modules loaded")
     
@@ -683,11 +1052,18 @@ if __name__ == "__main__":
     # MODIFICADO: Configuración para Docker
     host = os.getenv("API_HOST", "0.0.0.0")
     port = int(os.getenv("API_PORT", "8000"))
-    
-    uvicorn.run(
-        app, 
-        host=host, 
-        port=port,
-        log_level="info",
-        access_log=True
-    )
+    workers = int(os.getenv("WORKERS", "4"))
+
+    # MODIFICADO: gunicorn con workers uvicorn y --preload. La app (y los
+    # modelos, que se cargan al importar el módulo) se cargan una sola vez
+    # en el proceso padre; los workers forkeados comparten esas páginas
+    # read-only vía copy-on-write.
+    os.execvp("gunicorn", [
+        "gunicorn",
+        "main:app",
+        "--worker-class", "uvicorn.workers.UvicornWorker",
+        "--workers", str(workers),
+        "--preload",
+        "--bind", f"{host}:{port}",
+        "--access-logfile", "-"
+    ])
@@ -4,14 +4,46 @@ Carga modelos entrenados y replica la lógica del notebook
 """
 
 import joblib
+import math
 import pandas as pd
 import numpy as np
+import threading
+import time
+import xgboost as xgb
 from datetime import datetime
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Mappings categoría -> valor numérico, a nivel de módulo (se construyen
+# una sola vez, no por llamada)
+AGE_MAPPING = {
+    'below 18': 17, '16 to 17': 17, '18 to 20': 19, '21 to 25': 23,
+    '26 to 30': 28, '31 to 35': 33, '36 to 40': 38, '41 to 50': 45,
+    '51 to 65': 58, 'over 65': 70
+}
+
+PRICE_MAPPING = {
+    'less than 20000': 15000, '20000 to 29000': 24500,
+    '30000 to 39000': 34500, '40000 to 59000': 49500,
+    '60000 to 69000': 64500, 'more than 69000': 80000
+}
+
+VEHICLE_AGE_MAPPING = {
+    'new': 0, '2 years': 2, '3 years': 3, '4 years': 4,
+    '5 years': 5, '6 years': 6, '7 years': 7, 'more than 7': 10
+}
+
+DAYS_MAPPING = {
+    'none': 0, '1 to 7': 4, '8 to 15': 11,
+    '15 to 30': 22, 'more than 30': 45
+}
+
+LUXURY_PRICES = frozenset({'60000 to 69000', 'more than 69000'})
+YOUNG_AGES = frozenset({'18 to 20', '21 to 25'})
+PREMIUM_MAKES = frozenset({'BMW', 'Mercedes', 'Audi'})
+
 class FraudDetectionEngine:
     """Motor principal para detección de fraude con modelos ML"""
     
@@ -19,22 +51,98 @@ class FraudDetectionEngine:
         """Inicializa el engine cargando los modelos entrenados"""
         self.models_path = models_path
         self.load_models()
+        # El payload de /model/info es estático: construirlo una sola vez
+        self._cached_model_info = self._build_model_info()
         logger.info("✅ FraudDetectionEngine inicializado correctamente")
     
     def load_models(self):
         """Carga todos los modelos y mappings necesarios"""
         try:
-            # Cargar modelos ML
-            self.logistic_model = joblib.load(f'{self.models_path}/logistic_model.pkl')
-            self.xgb_model = joblib.load(f'{self.models_path}/xgb_model.pkl')
-            
-            # Cargar transformaciones y scorecard
-            self.woe_mappings = joblib.load(f'{self.models_path}/woe_mappings.pkl')
-            self.scorecard_dict = joblib.load(f'{self.models_path}/scorecard.pkl')
+            # Cargar los artefactos sklearn/numpy: bundle único comprimido
+            # con LZ4 (un solo open/load), con fallback al layout antiguo
+            # de cuatro pickles separados
+            try:
+                bundle = joblib.load(f'{self.models_path}/bundle.pkl')
+                self.logistic_model = bundle['logistic']
+                self.woe_mappings = bundle['woe']
+                self.scorecard_dict = bundle['scorecard']
+                self.metadata = bundle['metadata']
+            except FileNotFoundError:
+                self.logistic_model = joblib.load(f'{self.models_path}/logistic_model.pkl')
+                self.woe_mappings = joblib.load(f'{self.models_path}/woe_mappings.pkl')
+                self.scorecard_dict = joblib.load(f'{self.models_path}/scorecard.pkl')
+                self.metadata = joblib.load(f'{self.models_path}/metadata.pkl')
+
+            # Booster XGBoost en formato nativo UBJ: más pequeño y más
+            # rápido de cargar que un pickle del wrapper sklearn. Fallback
+            # al pickle para directorios de modelos antiguos
+            try:
+                self.xgb_model = xgb.Booster()
+                self.xgb_model.load_model(f'{self.models_path}/xgb_model.ubj')
+            except xgb.core.XGBoostError:
+                self.xgb_model = joblib.load(f'{self.models_path}/xgb_model.pkl')
+
+            # Normalizar los mappings WoE a dicts planos str -> float; así
+            # el lookup en prepare_features es un .get directo sin pandas.
+            # Soporta el layout SoA nuevo (arrays paralelos cats/woe), las
+            # Series de pandas de entrenamientos antiguos y dicts planos
+            def _to_woe_dict(m):
+                if isinstance(m, dict) and 'cats' in m and 'woe' in m:
+                    return dict(zip(m['cats'].tolist(),
+                                    m['woe'].astype(float).tolist()))
+                items = m.to_dict().items() if hasattr(m, 'to_dict') else m.items()
+                return {k: float(v) for k, v in items}
+
+            self.woe_mappings = {
+                var: _to_woe_dict(m) for var, m in self.woe_mappings.items()
+            }
             
-            # Cargar metadata
-            self.metadata = joblib.load(f'{self.models_path}/metadata.pkl')
             self.feature_names = self.metadata['feature_names']
+
+            # Índice posicional de cada feature para el vector numpy
+            self._idx = {name: i for i, name in enumerate(self.feature_names)}
+
+            # Booster nativo de XGBoost: inplace_predict sobre numpy evita
+            # construir un DMatrix por llamada (el coste dominante del
+            # wrapper sklearn en inferencia de una fila). El pickle puede
+            # contener el Booster directamente (entrenamiento con la API
+            # nativa) o el wrapper sklearn de versiones anteriores
+            if hasattr(self.xgb_model, 'get_booster'):
+                self._booster = self.xgb_model.get_booster()
+            else:
+                self._booster = self.xgb_model
+
+            # Respetar el early stopping del entrenamiento: predecir solo
+            # hasta la mejor iteración. (0, 0) equivale a todos los árboles
+            # cuando el booster no trae best_iteration
+            best_it = getattr(self._booster, 'best_iteration', None)
+            self._iter_range = (0, best_it + 1) if best_it is not None else (0, 0)
+
+            # Pesos de la regresión logística extraídos una vez: scorear
+            # es sigmoid(x @ w + b), sin el check_array ni el dispatch de
+            # sklearn por llamada
+            self._lr_w = self.logistic_model.coef_[0].astype(np.float32)
+            self._lr_b = float(self.logistic_model.intercept_[0])
+
+            # Buffer scratch reutilizado entre llamadas para el vector de
+            # features; per-thread porque la API ejecuta predicciones en
+            # el threadpool de asyncio.to_thread
+            self._scratch = threading.local()
+
+            # Vector de puntos del scorecard alineado a feature_names, para
+            # calcular los puntos con un único producto escalar. Los
+            # entrenamientos recientes exportan el vector int16 ya alineado;
+            # si no está, se reconstruye desde el DataFrame del scorecard
+            self._base_points = float(self.scorecard_dict['base_points'])
+            pts_i16 = self.scorecard_dict.get('points_i16')
+            if pts_i16 is not None and len(pts_i16) == len(self.feature_names):
+                self._points = np.asarray(pts_i16, dtype=np.float32)
+            else:
+                self._points = np.zeros(len(self.feature_names), dtype=np.float32)
+                for _, row in self.scorecard_dict['scorecard'].iterrows():
+                    i = self._idx.get(row['Variable'])
+                    if i is not None:
+                        self._points[i] = row['Points']
             
             logger.info(f"📊 Modelos cargados exitosamente")
             logger.info(f"   - Features: {len(self.feature_names)}")
@@ -46,83 +154,67 @@ class FraudDetectionEngine:
             raise
     
     def prepare_features(self, claim_data):
-        """Prepara las features desde los datos raw del claim"""
-        df = pd.DataFrame([claim_data])
-        
+        """Prepara el vector de features desde los datos raw del claim
+
+        Usa lookups de dict sobre un ndarray float32 preasignado en lugar de
+        construir DataFrames de pandas de una fila, cuyo overhead domina la
+        latencia de una predicción individual. El buffer se reutiliza entre
+        llamadas del mismo thread: el caller debe consumirlo (o copiarlo)
+        antes de la siguiente predicción.
+        """
+        x = getattr(self._scratch, 'x', None)
+        if x is None:
+            x = np.zeros(len(self.feature_names), dtype=np.float32)
+            self._scratch.x = x
+        else:
+            x.fill(0.0)
+        idx = self._idx
+
+        def set_feature(name, value):
+            i = idx.get(name)
+            if i is not None:
+                x[i] = value
+
         # 1. Convertir variables categóricas a numéricas
-        age_mapping = {
-            'below 18': 17, '16 to 17': 17, '18 to 20': 19, '21 to 25': 23,
-            '26 to 30': 28, '31 to 35': 33, '36 to 40': 38, '41 to 50': 45,
-            '51 to 65': 58, 'over 65': 70
-        }
-        df['AgeOfPolicyHolder_Numeric'] = df.get('AgeOfPolicyHolder', pd.Series()).map(age_mapping).fillna(35)
-        
-        price_mapping = {
-            'less than 20000': 15000, '20000 to 29000': 24500,
-            '30000 to 39000': 34500, '40000 to 59000': 49500,
-            '60000 to 69000': 64500, 'more than 69000': 80000
-        }
-        df['VehiclePrice_Numeric'] = df.get('VehiclePrice', pd.Series()).map(price_mapping).fillna(35000)
-        
-        vehicle_age_mapping = {
-            'new': 0, '2 years': 2, '3 years': 3, '4 years': 4,
-            '5 years': 5, '6 years': 6, '7 years': 7, 'more than 7': 10
-        }
-        df['AgeOfVehicle_Numeric'] = df.get('AgeOfVehicle', pd.Series()).map(vehicle_age_mapping).fillna(5)
-        
-        days_mapping = {
-            'none': 0, '1 to 7': 4, '8 to 15': 11,
-            '15 to 30': 22, 'more than 30': 45
-        }
-        df['Days_Policy_Claim_Numeric'] = df.get('Days_Policy_Claim', pd.Series()).map(days_mapping).fillna(30)
-        
+        set_feature('AgeOfPolicyHolder_Numeric',
+                    AGE_MAPPING.get(claim_data.get('AgeOfPolicyHolder'), 35))
+        set_feature('VehiclePrice_Numeric',
+                    PRICE_MAPPING.get(claim_data.get('VehiclePrice'), 35000))
+        set_feature('AgeOfVehicle_Numeric',
+                    VEHICLE_AGE_MAPPING.get(claim_data.get('AgeOfVehicle'), 5))
+        set_feature('Days_Policy_Claim_Numeric',
+                    DAYS_MAPPING.get(claim_data.get('Days_Policy_Claim'), 30))
+
         # 2. Crear variables de negocio
-        df['Claim_Urgency'] = (df.get('Days_Policy_Claim', '') == '1 to 7').astype(int)
-        df['Luxury_Vehicle'] = df.get('VehiclePrice', '').isin(['60000 to 69000', 'more than 69000']).astype(int)
-        df['Young_Driver'] = df.get('AgeOfPolicyHolder', '').isin(['18 to 20', '21 to 25']).astype(int)
-        df['Complex_Policy'] = df.get('PolicyType', '').str.contains('All Perils', na=False).astype(int)
-        df['Premium_Make'] = df.get('Make', '').isin(['BMW', 'Mercedes', 'Audi']).astype(int)
-        
+        set_feature('Claim_Urgency', 1 if claim_data.get('Days_Policy_Claim') == '1 to 7' else 0)
+        set_feature('Luxury_Vehicle', 1 if claim_data.get('VehiclePrice') in LUXURY_PRICES else 0)
+        set_feature('Young_Driver', 1 if claim_data.get('AgeOfPolicyHolder') in YOUNG_AGES else 0)
+        set_feature('Complex_Policy', 1 if 'All Perils' in (claim_data.get('PolicyType') or '') else 0)
+        set_feature('Premium_Make', 1 if claim_data.get('Make') in PREMIUM_MAKES else 0)
+
         # 3. Aplicar transformaciones WoE
         for var, woe_dict in self.woe_mappings.items():
-            if var in df.columns:
-                df[f'{var}_WoE'] = df[var].map(woe_dict).fillna(0)
-        
-        # 4. Seleccionar solo las features necesarias
-        X = pd.DataFrame()
-        for feature in self.feature_names:
-            if feature in df.columns:
-                X[feature] = df[feature]
-            else:
-                X[feature] = 0  # Default value para features faltantes
-        
-        return X
-    
-    def calculate_scorecard_points(self, X):
-        """Calcula los puntos del scorecard"""
-        scorecard = self.scorecard_dict['scorecard']
-        base_points = self.scorecard_dict['base_points']
-        
-        # Calcular puntos totales
-        total_points = base_points
-        points_breakdown = {"Base Score": int(base_points)}
-        
-        for idx, row in scorecard.iterrows():
-            variable = row['Variable']
-            points = row['Points']
-            
-            if variable in X.columns:
-                value = X[variable].iloc[0]
-                contribution = value * points
-                total_points += contribution
-                
-                # Simplificar nombre de variable para el breakdown
-                display_name = variable.replace('_WoE', '').replace('_Numeric', '')
-                if abs(contribution) > 0.5:  # Solo mostrar contribuciones significativas
-                    points_breakdown[display_name] = int(contribution)
-        
+            i = idx.get(f'{var}_WoE')
+            if i is not None:
+                x[i] = woe_dict.get(claim_data.get(var), 0.0)
+
+        # Features no cubiertas quedan en 0 (mismo default que antes)
+        return x
+
+    def calculate_scorecard_points(self, x):
+        """Calcula los puntos del scorecard con un único producto escalar"""
+        contributions = x * self._points
+        total_points = self._base_points + float(contributions.sum())
+
+        points_breakdown = {"Base Score": int(self._base_points)}
+        # Solo mostrar contribuciones significativas
+        for i in np.where(np.abs(contributions) > 0.5)[0]:
+            # Simplificar nombre de variable para el breakdown
+            display_name = self.feature_names[i].replace('_WoE', '').replace('_Numeric', '')
+            points_breakdown[display_name] = int(contributions[i])
+
         return int(total_points), points_breakdown
-    
+
     def identify_risk_factors(self, claim_data, fraud_prob):
         """Identifica los factores de riesgo principales"""
         risk_factors = []
@@ -154,23 +246,32 @@ class FraudDetectionEngine:
     
     def calculate_fraud_score(self, claim_data):
         """Calcula el score de fraude para un claim"""
-        start_time = datetime.now()
-        
+        t0 = time.perf_counter_ns()
+
+        # Aceptar tanto dicts como modelos Pydantic (la API pasa el modelo
+        # directamente sin materializar un dict intermedio)
+        if hasattr(claim_data, 'model_dump'):
+            claim_data = claim_data.model_dump()
+
         try:
-            # Preparar features
-            X = self.prepare_features(claim_data)
-            
-            # Usar modelo logístico como principal (más interpretable)
-            fraud_prob_logistic = self.logistic_model.predict_proba(X)[:, 1][0]
-            
-            # XGBoost como validación
-            fraud_prob_xgb = self.xgb_model.predict_proba(X)[:, 1][0]
+            # Preparar features (vector float32)
+            x = self.prepare_features(claim_data)
+            X = x.reshape(1, -1)
+
+            # Usar modelo logístico como principal (más interpretable);
+            # sigmoide inline con los pesos cacheados
+            z = float(x @ self._lr_w) + self._lr_b
+            fraud_prob_logistic = 1.0 / (1.0 + math.exp(-z))
+
+            # XGBoost como validación (booster nativo, sin DMatrix)
+            fraud_prob_xgb = float(self._booster.inplace_predict(
+                X, iteration_range=self._iter_range)[0])
             
             # Promedio ponderado (70% logistic, 30% xgb)
             fraud_prob = 0.7 * fraud_prob_logistic + 0.3 * fraud_prob_xgb
             
             # Calcular scorecard
-            risk_score, scorecard_breakdown = self.calculate_scorecard_points(X)
+            risk_score, scorecard_breakdown = self.calculate_scorecard_points(x)
             
             # Determinar nivel de riesgo
             if risk_score <= 580:
@@ -189,8 +290,8 @@ class FraudDetectionEngine:
             # Identificar factores de riesgo
             risk_factors = self.identify_risk_factors(claim_data, fraud_prob)
             
-            # Calcular tiempo de procesamiento
-            processing_time = (datetime.now() - start_time).total_seconds() * 1000
+            # Calcular tiempo de procesamiento (reloj monotónico)
+            processing_time = (time.perf_counter_ns() - t0) / 1e6
             
             return {
                 'fraud_probability': round(float(fraud_prob), 3),
@@ -199,6 +300,7 @@ class FraudDetectionEngine:
                 'confidence': confidence,
                 'key_risk_factors': risk_factors,
                 'scorecard_breakdown': scorecard_breakdown,
+                'points_adjustment': int(risk_score - self.scorecard_dict['base_points']),
                 'business_recommendation': recommendation,
                 'processing_time_ms': round(processing_time, 2),
                 'model_version': "1.0.0-production",
@@ -215,14 +317,82 @@ class FraudDetectionEngine:
                 'confidence': "Low",
                 'key_risk_factors': ["❌ Error en procesamiento"],
                 'scorecard_breakdown': {"Error": 0},
+                'points_adjustment': 0,
                 'business_recommendation': "MANUAL REVIEW REQUIRED - System error",
                 'processing_time_ms': 0,
                 'model_version': "1.0.0-error",
                 'timestamp': datetime.now().isoformat()
             }
     
+    def calculate_fraud_score_batch(self, claims):
+        """Calcula scores de fraude para N claims en una sola pasada
+
+        Construye una matriz (N, F) y llama a predict_proba una única vez
+        por modelo, amortizando el overhead de dispatch de sklearn/XGBoost
+        que domina cuando se procesan claims de uno en uno.
+        """
+        t0 = time.perf_counter_ns()
+
+        # Aceptar DataFrame (path del endpoint batch) o lista de dicts
+        if isinstance(claims, pd.DataFrame):
+            claims = claims.to_dict('records')
+        claims = [c.model_dump() if hasattr(c, 'model_dump') else c for c in claims]
+
+        # Matriz de features (N, F) rellenada fila a fila con el path de dicts
+        X = np.empty((len(claims), len(self.feature_names)), dtype=np.float32)
+        for i, claim in enumerate(claims):
+            X[i] = self.prepare_features(claim)
+
+        # Una sola llamada a cada modelo para todo el batch
+        z = X @ self._lr_w + self._lr_b
+        probs_logistic = 1.0 / (1.0 + np.exp(-z))
+        probs_xgb = self._booster.inplace_predict(X, iteration_range=self._iter_range)
+        fraud_probs = 0.7 * probs_logistic + 0.3 * probs_xgb
+
+        processing_time = (time.perf_counter_ns() - t0) / 1e6
+        timestamp = datetime.now().isoformat()
+        base_points = self.scorecard_dict['base_points']
+
+        results = []
+        for i, claim in enumerate(claims):
+            fraud_prob = float(fraud_probs[i])
+            risk_score, scorecard_breakdown = self.calculate_scorecard_points(X[i])
+
+            if risk_score <= 580:
+                risk_level = "HIGH"
+                confidence = "High"
+                recommendation = "INVESTIGATE IMMEDIATELY - Multiple high-risk indicators detected"
+            elif risk_score <= 620:
+                risk_level = "MEDIUM"
+                confidence = "Medium"
+                recommendation = "DETAILED REVIEW REQUIRED - Some concerning factors present"
+            else:
+                risk_level = "LOW"
+                confidence = "High"
+                recommendation = "STANDARD PROCESSING - Normal risk profile"
+
+            results.append({
+                'fraud_probability': round(fraud_prob, 3),
+                'risk_score': int(risk_score),
+                'risk_level': risk_level,
+                'confidence': confidence,
+                'key_risk_factors': self.identify_risk_factors(claim, fraud_prob),
+                'scorecard_breakdown': scorecard_breakdown,
+                'points_adjustment': int(risk_score - base_points),
+                'business_recommendation': recommendation,
+                'processing_time_ms': round(processing_time, 2),
+                'model_version': "1.0.0-production",
+                'timestamp': timestamp
+            })
+
+        return results
+
     def get_model_info(self):
-        """Retorna información sobre los modelos"""
+        """Retorna información sobre los modelos (dict memoizado)"""
+        return self._cached_model_info
+
+    def _build_model_info(self):
+        """Construye el dict de información de modelos (solo en __init__)"""
         return {
             "model_type": "Dual Model: Logistic Regression + XGBoost",
             "version": "1.0.0",